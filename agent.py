@@ -1,52 +1,114 @@
+import asyncio
+import contextlib
 import time
 import random
-import json
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any, List
+import orjson
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple, NamedTuple
 from loguru import logger
+import httpx
+import msgspec
 import os
-import sys
+from collections import defaultdict
 
-from api_client import APIClient, MaintenanceError, APIError
-from models import AgentState
-from strategy import CombatEvaluator, ItemManager, DeathZoneAvoider, TerrainPriority
+from api_client import APIClient, MaintenanceError, APIError, create_http_client, keep_connection_warm
+from utils import atomic_write
+from models import AgentState, AGENT_STATE_DECODER, STATE_RESPONSE_DECODER
+from strategy import CombatEvaluator, ItemManager, DeathZoneAvoider, ATTACK_REASONS, best_adjacent_region
+
+# Real-time length of one game turn, in seconds
+TURN_SECONDS = 60
+
+_MONSTER_NAMES = frozenset({'Wolf', 'Bear', 'Bandit'})
+
+_DIRECTIONS = ('north', 'northeast', 'southeast', 'south', 'southwest', 'northwest')
+
+# How long to wait after a 503 before checking whether maintenance is over
+MAINTENANCE_RECHECK_SECONDS = 300
+
+def _dicts(value: Any) -> List[Dict[str, Any]]:
+    """Dict entries of a loosely typed list field; [] if it isn't a list"""
+    if not isinstance(value, list):
+        return []
+    return [entry for entry in value if isinstance(entry, dict)]
+
+class DecisionContext(NamedTuple):
+    """Per-turn lookups shared by the decision checks"""
+    regions: Dict[str, Any]
+    current_region: Dict[str, Any]
+    adjacent: List[Dict[str, Any]]
+    adjacent_dirs: List[str]
+    units_in_region: List[Dict[str, Any]]
+    items_in_region: List[Dict[str, Any]]
 
 class MoltyAgent:
-    def __init__(self, agent_name: str = "ProBot"):
+    # Account file contents and last-written digests, shared per process
+    _account_cache: Dict[str, Dict[str, Any]] = {}
+    _account_digests: Dict[str, bytes] = {}
+    
+    def __init__(self, agent_name: str = "ProBot", account_file: str = "account_data.json",
+                 api_key_file: str = "api_key.txt", limiter: Optional[asyncio.Semaphore] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.agent_name = agent_name
-        self.api_client = APIClient()
+        self.api_client = APIClient(limiter=limiter, client=http_client)
+        # Agent state isn't coroutine-safe: only one arun() per agent at a time
+        self._lock = asyncio.Lock()
         self.account_id = None
         self.api_key = None
         self.game_id = None
         self.agent_id = None
         self.current_state: Optional[AgentState] = None
+        self._units_by_region: Dict[str, List[Dict[str, Any]]] = {}
+        self._items_by_region: Dict[str, List[Dict[str, Any]]] = {}
+        # ((game_id, agent_id), fetched_at monotonic, state) of the last poll
+        self._state_cache: Optional[Tuple[Tuple[str, str], float, AgentState]] = None
         self.game_start_time = None
         self.last_action_time = None
         self.consecutive_errors = 0
+        # Monotonic time before which state polls are skipped after failures
+        self._backoff_until_mono = 0.0
         self.in_maintenance = False
-        self.account_file = "account_data.json"
+        # Monotonic time at which to check whether maintenance is over
+        self._maint_exit_mono = 0.0
+        self.account_file = account_file
+        self.api_key_file = api_key_file
+        # Decision pipeline, in priority order
+        self._decision_checks = (
+            self._death_zone_check,
+            self._heal_check,
+            self._combat_check,
+            self._pickup_check,
+            self._move_check,
+        )
         
     def load_saved_account(self) -> bool:
-        """Load saved account data if exists"""
+        """Load saved account data if exists
+        
+        The file is read once per process; later calls use the memoized copy.
+        """
         try:
-            if os.path.exists(self.account_file):
-                with open(self.account_file, 'r') as f:
-                    data = json.load(f)
-                    self.account_id = data.get('account_id')
-                    self.api_key = data.get('api_key')
-                    
-                    if self.api_key:
-                        self.api_client.api_key = self.api_key
-                        self.api_client.session.headers.update({"X-API-Key": self.api_key})
-                        logger.info(f"Loaded saved account: {self.account_id}")
-                        return True
+            data = MoltyAgent._account_cache.get(self.account_file)
+            if data is None and os.path.exists(self.account_file):
+                with open(self.account_file, 'rb') as f:
+                    data = orjson.loads(f.read())
+                MoltyAgent._account_cache[self.account_file] = data
+            
+            if data:
+                self.account_id = data.get('account_id')
+                self.api_key = data.get('api_key')
+                
+                if self.api_key:
+                    self.api_client.api_key = self.api_key
+                    logger.info(f"Loaded saved account: {self.account_id}")
+                    return True
         except Exception as e:
             logger.warning(f"Failed to load saved account: {e}")
         
         return False
     
     def save_account_data(self, account_data: Dict[str, Any]):
-        """Save account data to file"""
+        """Save account data to file, skipping the write if nothing changed"""
         try:
             data = {
                 'account_id': account_data.get('accountId') or account_data.get('id'),
@@ -55,22 +117,29 @@ class MoltyAgent:
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            with open(self.account_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Also save plain text for easy access
+            text = f"API Key: {data['api_key']}\nAccount ID: {data['account_id']}\n"
+            if 'verificationCode' in account_data:
+                text += f"Verification Code: {account_data['verificationCode']}\n"
+            
+            # created_at always differs, so leave it out of the change check
+            stable = {k: v for k, v in data.items() if k != 'created_at'}
+            digest = hashlib.sha1(orjson.dumps(stable, option=orjson.OPT_SORT_KEYS) + text.encode()).digest()
+            if MoltyAgent._account_digests.get(self.account_file) == digest:
+                logger.debug(f"Account data unchanged, not rewriting {self.account_file}")
+                return
+            
+            atomic_write(self.account_file, orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+            atomic_write(self.api_key_file, text)
+            MoltyAgent._account_cache[self.account_file] = data
+            MoltyAgent._account_digests[self.account_file] = digest
             
             logger.info(f"Account data saved to {self.account_file}")
             
-            # Also save plain text for easy access
-            with open('api_key.txt', 'w') as f:
-                f.write(f"API Key: {data['api_key']}\n")
-                f.write(f"Account ID: {data['account_id']}\n")
-                if 'verificationCode' in account_data:
-                    f.write(f"Verification Code: {account_data['verificationCode']}\n")
-                    
         except Exception as e:
             logger.error(f"Failed to save account data: {e}")
     
-    def setup(self):
+    async def setup(self):
         """Initial setup: create account and get API key"""
         try:
             # Try to load saved account first
@@ -80,7 +149,7 @@ class MoltyAgent:
             
             # Create new account
             logger.info("Creating new account...")
-            result = self.api_client.create_account(self.agent_name)
+            result = await self.api_client.create_account(self.agent_name)
             
             logger.debug(f"Account creation result: {result}")
             
@@ -106,13 +175,12 @@ class MoltyAgent:
                         
                         # Update API client with key
                         self.api_client.api_key = self.api_key
-                        self.api_client.session.headers.update({"X-API-Key": self.api_key})
                         
                         logger.success(f"Account created! ID: {self.account_id}")
                         
                         # Try to get account info to verify
                         try:
-                            info = self.api_client.get_account_info()
+                            info = await self.api_client.get_account_info()
                             logger.info(f"Account verified: {info}")
                         except:
                             pass
@@ -126,23 +194,21 @@ class MoltyAgent:
                 return False
                 
         except MaintenanceError:
-            self.in_maintenance = True
+            self._enter_maintenance()
             logger.warning("Server under maintenance, cannot setup")
             return False
         except APIError as e:
             logger.error(f"API Error during setup: {e}")
             return False
-        except Exception as e:
-            logger.error(f"Setup failed: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Setup failed")
             return False
     
-    def find_or_create_game(self):
+    async def find_or_create_game(self):
         """Find waiting game or create new one"""
         try:
             # Try to find waiting game
-            games = self.api_client.get_waiting_games()
+            games = await self.api_client.get_waiting_games()
             
             logger.debug(f"Games response: {games}")
             
@@ -167,7 +233,7 @@ class MoltyAgent:
             
             # Create new game
             logger.info("No waiting games, creating new...")
-            new_game = self.api_client.create_game()
+            new_game = await self.api_client.create_game()
             
             logger.debug(f"Create game response: {new_game}")
             
@@ -190,21 +256,21 @@ class MoltyAgent:
             return False
             
         except MaintenanceError:
-            self.in_maintenance = True
+            self._enter_maintenance()
             logger.warning("Server under maintenance")
             return False
         except Exception as e:
             logger.error(f"Failed to find/create game: {e}")
             return False
     
-    def register(self):
+    async def register(self):
         """Register agent in game"""
         try:
             if not self.api_key:
                 logger.error("No API key available")
                 return False
             
-            result = self.api_client.register_agent(self.game_id, f"{self.agent_name}_AI")
+            result = await self.api_client.register_agent(self.game_id, f"{self.agent_name}_AI")
             
             logger.debug(f"Register response: {result}")
             
@@ -229,120 +295,211 @@ class MoltyAgent:
             return False
                 
         except MaintenanceError:
-            self.in_maintenance = True
+            self._enter_maintenance()
             logger.warning("Server under maintenance")
             return False
         except Exception as e:
             logger.error(f"Registration failed: {e}")
             return False
     
-    def get_game_state(self) -> Optional[Dict[str, Any]]:
-        """Get current game state"""
+    async def get_game_state(self, refresh: bool = False) -> Optional[AgentState]:
+        """Get current game state
+        
+        Within a turn the last fetched state is served from memory unless
+        `refresh` is set; a successful action invalidates it.
+        """
         if not self.game_id or not self.agent_id:
             return None
         
-        state = self.api_client.get_agent_state(self.game_id, self.agent_id)
+        # Still backing off from failed polls
+        if time.monotonic() < self._backoff_until_mono:
+            return None
         
-        if state and isinstance(state, dict):
-            # Extract data from response
-            state_data = None
-            if state.get('success') and 'data' in state:
-                state_data = state['data']
-            elif 'data' in state:
-                state_data = state['data']
-            else:
-                state_data = state
-            
-            if state_data:
-                self.current_state = AgentState(**state_data)
-                self.consecutive_errors = 0
-                return state_data
-            else:
-                self.consecutive_errors += 1
-                return None
-        else:
-            self.consecutive_errors += 1
+        cached = self._state_cache
+        if (not refresh and cached and cached[0] == (self.game_id, self.agent_id)
+                and time.monotonic() - cached[1] < TURN_SECONDS):
+            return cached[2]
+        
+        raw = await self.api_client.get_agent_state(self.game_id, self.agent_id)
+        
+        state = self._decode_state(raw) if raw else None
+        if state:
+            self.current_state = state
+            self._index_by_region(state)
+            self._state_cache = ((self.game_id, self.agent_id), time.monotonic(), state)
+            self.consecutive_errors = 0
+            self._backoff_until_mono = 0.0
+            return state
+        
+        self._poll_failed()
+        return None
+    
+    @staticmethod
+    def _decode_state(raw: bytes) -> Optional[AgentState]:
+        """Decode a state body, with or without the {"data": ...} envelope"""
+        try:
+            response = STATE_RESPONSE_DECODER.decode(raw)
+            if response.data is not None:
+                return response.data
+            return AGENT_STATE_DECODER.decode(raw)
+        except msgspec.DecodeError as e:
+            logger.error(f"Invalid state response: {e}")
             return None
     
-    def decide_action(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Core AI decision making"""
+    def _poll_failed(self):
+        """Count a failed state poll and push back the next one
         
-        # Parse state into objects
-        try:
-            agent = AgentState(**state)
-        except Exception as e:
-            logger.error(f"Failed to parse agent state: {e}")
-            return {"action": "rest"}  # Default action
+        Waits 2, 4, 8, ... up to 300s, plus up to 2s of jitter so agents
+        that failed together don't all retry together.
+        """
+        self.consecutive_errors += 1
+        delay = min(300, 2 ** self.consecutive_errors) + random.uniform(0, 2)
+        self._backoff_until_mono = time.monotonic() + delay
+    
+    def _index_by_region(self, state: AgentState):
+        """Group visible units and items by region, once per state
+        
+        Entities without a regionId are treated as being in our region.
+        """
+        here = state.regionId
+        
+        units_by_region = defaultdict(list)
+        for unit in _dicts(state.units):
+            units_by_region[unit.get('regionId', here)].append(unit)
+        
+        items_by_region = defaultdict(list)
+        for item in _dicts(state.items):
+            items_by_region[item.get('regionId', here)].append(item)
+        
+        self._units_by_region = units_by_region
+        self._items_by_region = items_by_region
+    
+    def decide_action(self, agent: AgentState) -> Dict[str, Any]:
+        """Core AI decision making
+        
+        Checks run in priority order; the first one to return an action wins.
+        """
         
         # Priority 1: Check if we're alive
         if not agent.isAlive:
             logger.error("Agent is dead!")
             return {"action": "rest"}
         
-        # Priority 2: Check for death zone (simplified for now)
-        # Since we don't have full region data, we'll be cautious
+        # Look everything up once for all checks
+        regions = agent.regions if isinstance(agent.regions, dict) else {}
+        current_region = regions.get(agent.regionId)
+        adjacent = _dicts(agent.adjacentRegions)
+        ctx = DecisionContext(
+            regions=regions,
+            current_region=current_region if isinstance(current_region, dict) else {},
+            adjacent=adjacent,
+            adjacent_dirs=[a['direction'] for a in adjacent if isinstance(a.get('direction'), str)],
+            units_in_region=self._units_by_region.get(agent.regionId, []),
+            items_in_region=self._items_by_region.get(agent.regionId, []),
+        )
+        
+        for check in self._decision_checks:
+            action = check(agent, ctx)
+            if action:
+                return action
         
-        # Priority 3: Check health
+        # Default: rest
+        logger.info("No action, resting")
+        return {"action": "rest"}
+    
+    def _death_zone_check(self, agent: AgentState, ctx: DecisionContext) -> Optional[Dict[str, Any]]:
+        """Priority 2: Get out of the death zone"""
+        if not DeathZoneAvoider.is_in_death_zone(ctx.current_region):
+            return None
+        
+        direction = DeathZoneAvoider.find_safe_direction(
+            ctx.current_region, ctx.adjacent, DeathZoneAvoider.safe_component_sizes(ctx.regions))
+        if direction:
+            logger.warning(f"In death zone, moving {direction}")
+            return {"action": "move", "target": direction}
+        return None
+    
+    def _heal_check(self, agent: AgentState, ctx: DecisionContext) -> Optional[Dict[str, Any]]:
+        """Priority 3: Check health"""
         if ItemManager.need_healing(agent):
-            healing_item = ItemManager.get_best_healing_item([i.dict() for i in agent.inventory])
+            healing_item = ItemManager.get_best_healing_item(agent.inventory)
             if healing_item:
                 logger.info(f"Using healing item")
                 return {
                     "action": "useItem",
-                    "target": healing_item['id']
+                    "target": healing_item.id
                 }
+        return None
+    
+    def _combat_check(self, agent: AgentState, ctx: DecisionContext) -> Optional[Dict[str, Any]]:
+        """Priority 4: Check for threats in same region"""
+        # Every attack below needs 2 EP
+        if not ctx.units_in_region or agent.ep < 2:
+            return None
         
-        # Priority 4: Check for threats in same region
-        units_in_region = state.get('units', [])
-        
-        if units_in_region:
-            # Filter out self
-            other_units = [u for u in units_in_region if u.get('id') != agent.id]
-            
-            for unit in other_units:
-                # Check if it's a monster (simplified)
-                if unit.get('type') == 'monster' or unit.get('name') in ['Wolf', 'Bear', 'Bandit']:
-                    if agent.ep >= 2:
-                        logger.info(f"Attacking monster: {unit.get('name')}")
-                        return {"action": "attack", "target": unit['id']}
+        # One pass: attack the first monster, collect other agents on the way
+        rivals = []
+        for unit in ctx.units_in_region:
+            if unit.get('id') == agent.id:
+                continue
+            # Check if it's a monster (simplified)
+            if unit.get('type') == 'monster' or unit.get('name') in _MONSTER_NAMES:
+                logger.info(f"Attacking monster: {unit.get('name')}")
+                return {"action": "attack", "target": unit['id']}
+            if unit.get('type') == 'agent':
+                rivals.append(unit)
         
-        # Priority 5: Check for items
-        items_in_region = state.get('items', [])
+        # Other agents: screen our own stats once, then try the weakest first
+        if not rivals or not CombatEvaluator.can_attack(agent):
+            return None
         
-        if items_in_region and len(agent.inventory) < 10:
+        rivals.sort(key=lambda u: u.get('hp', 100))
+        picked = CombatEvaluator.pick_target(agent, rivals)
+        if picked:
+            unit, reason = picked
+            logger.info(f"Attacking {unit.get('name')}: {ATTACK_REASONS[reason]}")
+            return {"action": "attack", "target": unit['id']}
+        return None
+    
+    def _pickup_check(self, agent: AgentState, ctx: DecisionContext) -> Optional[Dict[str, Any]]:
+        """Priority 5: Check for items"""
+        if ctx.items_in_region and len(agent.inventory) < 10:
             # Pick up first item
-            first_item = items_in_region[0]
+            first_item = ctx.items_in_region[0]
             logger.info(f"Picking up item")
             return {"action": "pickup", "target": first_item['id']}
+        return None
+    
+    def _move_check(self, agent: AgentState, ctx: DecisionContext) -> Optional[Dict[str, Any]]:
+        """Priority 6: Explore or move"""
+        if agent.ep < 1:
+            return None
         
-        # Priority 6: Explore or move
-        if agent.ep >= 1:
-            # Check if we should rest
-            if agent.ep < 3:
-                logger.info("Resting to recover EP")
-                return {"action": "rest"}
-            
-            # Explore current region
-            if random.random() < 0.5:
-                logger.info("Exploring current region")
-                return {"action": "explore"}
-            
-            # Move to random direction
-            directions = ['north', 'northeast', 'southeast', 'south', 'southwest', 'northwest']
-            direction = random.choice(directions)
-            logger.info(f"Moving {direction}")
-            return {"action": "move", "target": direction}
+        # Check if we should rest
+        if agent.ep < 3:
+            logger.info("Resting to recover EP")
+            return {"action": "rest"}
         
-        # Default: rest
-        logger.info("No action, resting")
-        return {"action": "rest"}
+        # Explore current region
+        if random.random() < 0.5:
+            logger.info("Exploring current region")
+            return {"action": "explore"}
+        
+        # Move toward the best adjacent region, or randomly without a usable one
+        best_idx, best_score = best_adjacent_region(ctx.adjacent)
+        if best_idx >= 0:
+            direction = ctx.adjacent[best_idx]['direction']
+        else:
+            direction = random.choice(ctx.adjacent_dirs or _DIRECTIONS)
+        logger.info(f"Moving {direction}")
+        return {"action": "move", "target": direction}
     
-    def execute_action(self, action: Dict[str, Any]):
+    async def execute_action(self, action: Dict[str, Any]):
         """Execute decided action"""
         if not self.game_id or not self.agent_id:
             return False
         
-        result = self.api_client.send_action(
+        result = await self.api_client.send_action(
             self.game_id, 
             self.agent_id,
             action['action'],
@@ -354,6 +511,7 @@ class MoltyAgent:
             # Check if action was successful
             if result.get('success') or 'data' in result:
                 self.last_action_time = datetime.now(timezone.utc)
+                self._state_cache = None
                 logger.info(f"Action {action['action']} successful")
                 return True
             else:
@@ -363,115 +521,270 @@ class MoltyAgent:
             logger.error(f"Action failed: invalid response")
             return False
     
-    def check_maintenance_window(self) -> bool:
-        """Check if we're in maintenance window (09:30-10:30 UTC)"""
-        now = datetime.now(timezone.utc)
-        maintenance_start = now.replace(hour=9, minute=30, second=0, microsecond=0)
-        maintenance_end = now.replace(hour=10, minute=30, second=0, microsecond=0)
+    def _enter_maintenance(self):
+        """Record that the server answered 503"""
+        self.in_maintenance = True
+        self._maint_exit_mono = time.monotonic() + MAINTENANCE_RECHECK_SECONDS
+    
+    async def check_maintenance_window(self) -> float:
+        """Seconds left to wait out maintenance, 0 if the server is up
         
-        if now >= maintenance_start and now <= maintenance_end:
-            if not self.in_maintenance:
-                logger.warning("Entering maintenance window, pausing all activities")
-                self.in_maintenance = True
-            return True
-        else:
-            if self.in_maintenance:
-                logger.info("Maintenance window ended, resuming operations")
-                self.in_maintenance = False
-            return False
+        Maintenance is only assumed after the server answers 503. Once the
+        wait is over, one cheap request checks whether it still is.
+        """
+        if not self.in_maintenance:
+            return 0.0
+        
+        remaining = self._maint_exit_mono - time.monotonic()
+        if remaining > 0:
+            return remaining
+        
+        try:
+            await self.api_client.get_waiting_games()
+        except MaintenanceError:
+            self._enter_maintenance()
+            return MAINTENANCE_RECHECK_SECONDS
+        except Exception as e:
+            # Not maintenance; the game loop deals with other failures
+            logger.debug(f"Maintenance probe failed: {e}")
+        
+        logger.info("Maintenance over, resuming operations")
+        self.in_maintenance = False
+        return 0.0
+    
+    def _next_poll_delay(self, state: AgentState) -> float:
+        """Seconds until the server's next turn, or TURN_SECONDS if it doesn't say"""
+        next_tick = state.nextTickAt or state.tickEndsAt
+        if not next_tick:
+            return TURN_SECONDS
+        
+        try:
+            if isinstance(next_tick, (int, float)):
+                # Epoch timestamp, in milliseconds if it's that large
+                next_tick_at = datetime.fromtimestamp(
+                    next_tick / 1000 if next_tick > 1e12 else next_tick, timezone.utc)
+            else:
+                next_tick_at = datetime.fromisoformat(next_tick)
+                if next_tick_at.tzinfo is None:
+                    next_tick_at = next_tick_at.replace(tzinfo=timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return TURN_SECONDS
+        
+        # Land just after the tick; clamp in case of clock skew
+        delay = (next_tick_at - datetime.now(timezone.utc)).total_seconds() + 0.2
+        return min(max(1.0, delay), 2 * TURN_SECONDS)
+    
+    async def step(self) -> Optional[float]:
+        """Play one iteration of the game loop
+        
+        Returns how many seconds to wait before the next step, or None once
+        the agent is done (game over, dead, or too many errors).
+        """
+        try:
+            # Check maintenance
+            remaining = await self.check_maintenance_window()
+            if remaining:
+                logger.info(f"In maintenance, checking again in {remaining:.0f}s...")
+                return remaining + random.uniform(1, 5)
+            
+            # Get current state
+            state = await self.get_game_state(refresh=True)
+            if not state:
+                if self.consecutive_errors > 5:
+                    logger.error("Too many consecutive errors, restarting...")
+                    return None
+                delay = max(0.0, self._backoff_until_mono - time.monotonic())
+                logger.warning(f"No state received, retrying in {delay:.1f}s... "
+                               f"(error {self.consecutive_errors}/5)")
+                return delay
+            
+            # Check if game is running
+            game_status = state.status
+            
+            if game_status != 'running':
+                if game_status == 'finished':
+                    logger.success(f"Game finished! Kills: {state.kills}")
+                    return None
+                
+                logger.info(f"Game status: {game_status}, waiting...")
+                return 30
+            
+            # Check if agent is alive
+            if not state.isAlive:
+                logger.error("Agent died! Game over.")
+                return None
+            
+            # Log current status
+            logger.info(f"Status: HP={state.hp}/{state.maxHp}, "
+                       f"EP={state.ep}/{state.maxEp}, "
+                       f"Kills={state.kills}")
+            
+            # Decide and execute action
+            action = self.decide_action(state)
+            logger.info(f"Decision: {action}")
+            await self.execute_action(action)
+            
+            # Wait for next turn (60 seconds real time unless the server says otherwise)
+            return self._next_poll_delay(state)
+            
+        except MaintenanceError:
+            self._enter_maintenance()
+            logger.warning("Maintenance detected, waiting...")
+            return MAINTENANCE_RECHECK_SECONDS
+        except Exception:
+            logger.exception("Error in game loop")
+            return 30
     
-    def run_game_loop(self):
+    async def run_game_loop(self):
         """Main game loop"""
         logger.info("Starting game loop...")
         
         while True:
             try:
-                # Check maintenance
-                if self.check_maintenance_window():
-                    logger.info("In maintenance, sleeping 5 minutes...")
-                    time.sleep(300)  # Sleep 5 minutes
-                    continue
-                
-                # Get current state
-                state = self.get_game_state()
-                if not state:
-                    if self.consecutive_errors > 5:
-                        logger.error("Too many consecutive errors, restarting...")
-                        break
-                    logger.warning(f"No state received, waiting... (error {self.consecutive_errors}/5)")
-                    time.sleep(30)
-                    continue
-                
-                # Check if game is running
-                game_status = state.get('status', 'unknown')
-                
-                if game_status != 'running':
-                    if game_status == 'finished':
-                        logger.success(f"Game finished! Kills: {state.get('kills', 0)}")
-                        break
-                    
-                    logger.info(f"Game status: {game_status}, waiting...")
-                    time.sleep(30)
-                    continue
-                
-                # Check if agent is alive
-                if not state.get('isAlive', True):
-                    logger.error("Agent died! Game over.")
-                    break
-                
-                # Log current status
-                logger.info(f"Status: HP={state.get('hp', '?')}/{state.get('maxHp', '?')}, "
-                           f"EP={state.get('ep', '?')}/{state.get('maxEp', '?')}, "
-                           f"Kills={state.get('kills', 0)}")
-                
-                # Decide and execute action
-                action = self.decide_action(state)
-                logger.info(f"Decision: {action}")
-                self.execute_action(action)
-                
-                # Wait for next turn (60 seconds real time)
-                time.sleep(60)
-                
-            except MaintenanceError:
-                self.in_maintenance = True
-                logger.warning("Maintenance detected, waiting...")
-                time.sleep(300)
+                delay = await self.step()
             except KeyboardInterrupt:
                 logger.info("Game loop stopped by user")
                 break
-            except Exception as e:
-                logger.error(f"Error in game loop: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(30)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
     
-    def run(self):
-        """Main execution flow"""
-        logger.info(f"Starting Molty Agent: {self.agent_name}")
-        
-        # Check maintenance first
-        if self.check_maintenance_window():
-            logger.info("Currently in maintenance window. Waiting...")
-            while self.check_maintenance_window():
-                time.sleep(60)
-        
+    async def bootstrap(self) -> bool:
+        """Setup, find or create a game, and register"""
         # Setup
-        if not self.setup():
+        if not await self.setup():
             logger.error("Setup failed")
             return False
         
+        self.api_client.start_keepalive()
+        
         # Find or create game
-        if not self.find_or_create_game():
+        if not await self.find_or_create_game():
             logger.error("Failed to get game")
             return False
         
         # Register agent
-        if not self.register():
+        if not await self.register():
             logger.error("Failed to register")
             return False
         
-        # Run main loop
-        self.run_game_loop()
+        return True
+    
+    async def start(self) -> bool:
+        """Bootstrap, retrying once the server's maintenance is over"""
+        logger.info(f"Starting Molty Agent: {self.agent_name}")
+        
+        while not await self.bootstrap():
+            if not self.in_maintenance:
+                return False
+            
+            logger.info("Currently in maintenance. Waiting...")
+            await asyncio.sleep(MAINTENANCE_RECHECK_SECONDS + random.uniform(1, 5))
+            self.in_maintenance = False
         
-        logger.info("Agent execution completed")
         return True
+    
+    async def arun(self):
+        """Main execution flow"""
+        async with self._lock:
+            try:
+                if not await self.start():
+                    return False
+                
+                # Run main loop
+                await self.run_game_loop()
+                
+                logger.info("Agent execution completed")
+                return True
+            finally:
+                await self.api_client.close()
+    
+    def run(self):
+        """Blocking entry point for a single agent"""
+        return asyncio.run(self.arun())
+
+
+class AgentPool:
+    """Drive many agents on one event loop with a cap on concurrent steps
+    
+    Each agent runs its own step/sleep loop, so a slow agent never holds
+    back another agent's turn; the semaphore only bounds how many steps
+    are in flight at once.
+    """
+    
+    # Agents stepped at once; keeps bursts within the API's rate cap
+    MAX_CONCURRENT_STEPS = 8
+    
+    def __init__(self, agents: List[MoltyAgent], max_concurrent_steps: int = MAX_CONCURRENT_STEPS):
+        self.agents = agents
+        self._semaphore = asyncio.Semaphore(max_concurrent_steps)
+    
+    async def _drive(self, agent: MoltyAgent):
+        """Step one agent on its own schedule until it is done"""
+        while True:
+            async with self._semaphore:
+                delay = await agent.step()
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
+    
+    async def run(self) -> List[Any]:
+        """Bootstrap every agent, then step them until all are done"""
+        async with contextlib.AsyncExitStack() as stack:
+            for agent in self.agents:
+                await stack.enter_async_context(agent._lock)
+                stack.push_async_callback(agent.api_client.close)
+            
+            results = await asyncio.gather(*(agent.start() for agent in self.agents),
+                                           return_exceptions=True)
+            
+            running = [agent for agent, ok in zip(self.agents, results) if ok is True]
+            if running:
+                logger.info(f"Starting game loop for {len(running)} agents...")
+            await asyncio.gather(*(self._drive(agent) for agent in running))
+        
+        return results
+
+
+class ParallelMoltyRunner:
+    """Fan out many independent MoltyAgent instances on one event loop"""
+    
+    def __init__(self, agent_name: str = "ProBot", max_concurrent_requests: int = 0):
+        self.agent_name = agent_name
+        # Shared across agents so the server sees at most N requests in flight
+        self.limiter = asyncio.Semaphore(max_concurrent_requests) if max_concurrent_requests > 0 else None
+        # One connection pool for every agent; auth is sent per request
+        self.http_client = create_http_client()
+    
+    def build_agents(self, n: int) -> List[MoltyAgent]:
+        """Create n agents, each with its own account files"""
+        if n == 1:
+            return [MoltyAgent(self.agent_name, limiter=self.limiter, http_client=self.http_client)]
+        
+        return [
+            MoltyAgent(f"{self.agent_name}{i}",
+                       account_file=f"account_data_{i}.json",
+                       api_key_file=f"api_key_{i}.txt",
+                       limiter=self.limiter,
+                       http_client=self.http_client)
+            for i in range(n)
+        ]
+    
+    async def run(self, agents: List[MoltyAgent]) -> List[Any]:
+        """Run the given agents on one AgentPool and wait for all of them to finish"""
+        keepalive = asyncio.create_task(keep_connection_warm(self.http_client))
+        try:
+            results = await AgentPool(agents).run()
+        finally:
+            keepalive.cancel()
+            await self.http_client.aclose()
+        
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.opt(exception=result).error(f"Agent {i} crashed: {result}")
+        
+        return results
+    
+    async def spawn(self, n: int) -> List[Any]:
+        """Run n agents concurrently and wait for all of them to finish"""
+        return await self.run(self.build_agents(n))
@@ -1,146 +1,254 @@
-import requests
-import time
-from typing import Optional, Dict, Any, List
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import httpx
+import asyncio
+import contextlib
+import orjson
+from typing import Optional, Dict, Any, Tuple
 from loguru import logger
 import os
-from datetime import datetime, timezone
+import socket
 
 BASE_URL = "https://mort-royal-production.up.railway.app/api"
 
+# Keep idle pooled connections longer than one 60s turn so polls reuse them
+# (75s also matches nginx's default keepalive_timeout)
+KEEPALIVE_TIMEOUT = 75
+MAX_KEEPALIVE_CONNECTIONS = 20
+MAX_CONNECTIONS = 100
+
+REQUEST_TIMEOUT = 30.0
+
+# Attempts for setup-time calls; transport errors back off 2s, 4s, ... up to 10s
+MAX_ATTEMPTS = 3
+
+# Send small JSON bodies immediately (no Nagle delay) and let the kernel
+# probe idle connections
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# Ping often enough to beat NAT/load balancer idle timeouts between polls
+KEEPALIVE_PING_INTERVAL = 25
+
+# Bodies for actions that never carry a target, serialized once at import
+_STATIC_ACTION_BODIES = {action: orjson.dumps({"action": action}) for action in ("rest", "explore")}
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class APIError(Exception):
     pass
 
 class MaintenanceError(APIError):
     pass
 
+def create_http_client() -> httpx.AsyncClient:
+    """HTTP client that can be shared by every agent in the process"""
+    # HTTP/2 lets concurrent agents multiplex requests over one TLS connection
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=MAX_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_TIMEOUT
+        ),
+        socket_options=SOCKET_OPTIONS
+    )
+    return httpx.AsyncClient(
+        headers={"Connection": "keep-alive"},
+        timeout=REQUEST_TIMEOUT,
+        transport=transport
+    )
+
+async def keep_connection_warm(client: httpx.AsyncClient, interval: float = KEEPALIVE_PING_INTERVAL):
+    """Ping the API forever so pooled connections never sit idle for long"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await client.get(f"{BASE_URL}/", timeout=5)
+        except httpx.HTTPError as e:
+            logger.debug(f"Keepalive ping failed: {e}")
+
 class APIClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, limiter: Optional[asyncio.Semaphore] = None,
+                 client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or os.getenv("MOLTY_API_KEY")
-        self.session = requests.Session()
+        # A client passed in is shared with other agents and closed by its owner
+        self._client = client
+        self._owns_client = client is None
+        # Optional semaphore shared between agents to cap in-flight requests
+        self._limiter = limiter or contextlib.nullcontext()
+        self._keepalive_task: Optional[asyncio.Task] = None
+        # (game_id, agent_id) -> (state URL, action URL) for the current agent
+        self._agent_urls_key: Optional[Tuple[str, str]] = None
+        self._agent_urls: Tuple[str, str] = ("", "")
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client, created lazily unless one was shared with us"""
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client()
+            self._owns_client = True
+        return self._client
+    
+    def agent_urls(self, game_id: str, agent_id: str) -> Tuple[str, str]:
+        """State and action URLs, built once per (game, agent)"""
+        if self._agent_urls_key != (game_id, agent_id):
+            base = f"{BASE_URL}/games/{game_id}/agents/{agent_id}"
+            self._agent_urls = (f"{base}/state", f"{base}/action")
+            self._agent_urls_key = (game_id, agent_id)
+        return self._agent_urls
+    
+    def _headers(self) -> Dict[str, str]:
+        """Auth headers for the current API key"""
         if self.api_key:
-            self.session.headers.update({"X-API-Key": self.api_key})
+            return {"X-API-Key": self.api_key}
+        return {}
     
-    def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
-        """Handle API response with proper error checking"""
+    def start_keepalive(self, interval: float = KEEPALIVE_PING_INTERVAL):
+        """Keep our own connection warm in the background
+        
+        Shared clients are kept warm by their owner, so this is a no-op there.
+        """
+        if self._owns_client and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(keep_connection_warm(self.client, interval))
+    
+    async def close(self):
+        """Close the HTTP client if this APIClient created it"""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _request(self, method: str, url: str, attempts: int = 1,
+                       headers: Optional[Dict[str, str]] = None, raw: bool = False, **kwargs) -> Any:
+        """Send a request while holding the shared limiter
+        
+        Transport errors are retried until `attempts` is used up. With `raw`
+        the undecoded body is returned instead of the parsed JSON.
+        """
+        request_headers = self._headers()
+        if headers:
+            request_headers.update(headers)
+        
+        for attempt in range(attempts):
+            try:
+                async with self._limiter:
+                    response = await self.client.request(method, url, headers=request_headers, **kwargs)
+                break
+            except httpx.TransportError as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = min(10, 2 ** (attempt + 1))
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+        
+        if raw:
+            self._check_status(response)
+            return response.content
+        return self._handle_response(response)
+    
+    def _check_status(self, response: httpx.Response):
+        """Raise for maintenance and error responses"""
         if response.status_code == 503:
             raise MaintenanceError("Server under maintenance")
         
-        # Log response for debugging
-        logger.debug(f"Response {response.status_code}: {response.text[:200]}")
+        # Log response for debugging; the body is only decoded if DEBUG is enabled
+        logger.opt(lazy=True).debug("Response {}: {}", lambda: response.status_code,
+                                    lambda: response.text[:200])
         
         if response.status_code >= 400:
             error_msg = f"API Error {response.status_code}: {response.text}"
             logger.error(error_msg)
             raise APIError(error_msg)
+    
+    def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
+        """Handle API response with proper error checking"""
+        self._check_status(response)
         
         try:
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Failed to parse JSON response: {e}")
             return {"success": False, "error": "Invalid JSON response"}
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(requests.RequestException)
-    )
-    def create_account(self, name: str) -> Dict[str, Any]:
+    async def create_account(self, name: str) -> Dict[str, Any]:
         """Step 1: Create account and get API key"""
         logger.info(f"Creating account with name: {name}")
         
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        response = self.session.post(
+        result = await self._request(
+            "POST",
             f"{BASE_URL}/accounts",
-            json={"name": name},
-            headers=headers
+            attempts=MAX_ATTEMPTS,
+            json={"name": name}
         )
         
-        result = self._handle_response(response)
-        
         # Log full response for debugging
         logger.debug(f"Create account response: {result}")
         
         return result
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def get_account_info(self) -> Dict[str, Any]:
+    async def get_account_info(self) -> Dict[str, Any]:
         """Get current account info"""
-        response = self.session.get(f"{BASE_URL}/accounts/me")
-        return self._handle_response(response)
+        return await self._request("GET", f"{BASE_URL}/accounts/me", attempts=MAX_ATTEMPTS)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def get_waiting_games(self) -> Dict[str, Any]:
+    async def get_waiting_games(self) -> Dict[str, Any]:
         """Get list of waiting games"""
-        response = self.session.get(f"{BASE_URL}/games?status=waiting")
-        return self._handle_response(response)
+        return await self._request("GET", f"{BASE_URL}/games?status=waiting", attempts=MAX_ATTEMPTS)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def create_game(self) -> Dict[str, Any]:
+    async def create_game(self) -> Dict[str, Any]:
         """Create a new game"""
-        response = self.session.post(f"{BASE_URL}/games")
-        return self._handle_response(response)
+        return await self._request("POST", f"{BASE_URL}/games", attempts=MAX_ATTEMPTS)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
-    def register_agent(self, game_id: str, agent_name: str) -> Dict[str, Any]:
+    async def register_agent(self, game_id: str, agent_name: str) -> Dict[str, Any]:
         """Register agent in a game"""
         logger.info(f"Registering agent {agent_name} in game {game_id}")
         
-        headers = {
-            "Content-Type": "application/json",
-            "X-API-Key": self.api_key
-        }
-        
-        response = self.session.post(
+        return await self._request(
+            "POST",
             f"{BASE_URL}/games/{game_id}/agents/register",
-            json={"name": agent_name},
-            headers=headers
+            attempts=MAX_ATTEMPTS,
+            json={"name": agent_name}
         )
-        
-        return self._handle_response(response)
     
-    def get_agent_state(self, game_id: str, agent_id: str) -> Optional[Dict[str, Any]]:
-        """Get agent state (no retry, called frequently)"""
+    async def get_agent_state(self, game_id: str, agent_id: str) -> Optional[bytes]:
+        """Get agent state as the raw JSON body (no retry, called frequently)"""
         try:
-            response = self.session.get(
-                f"{BASE_URL}/games/{game_id}/agents/{agent_id}/state"
-            )
-            return self._handle_response(response)
+            return await self._request("GET", self.agent_urls(game_id, agent_id)[0], raw=True)
+        except MaintenanceError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get agent state: {e}")
             return None
     
-    def send_action(self, game_id: str, agent_id: str, action: str, target: Optional[str] = None, data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+    async def send_action(self, game_id: str, agent_id: str, action: str, target: Optional[str] = None, data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         """Send action to game"""
         try:
+            url = self.agent_urls(game_id, agent_id)[1]
+            
+            if not target and not data and action in _STATIC_ACTION_BODIES:
+                logger.debug("Sending action: {}", action)
+                return await self._request(
+                    "POST",
+                    url,
+                    content=_STATIC_ACTION_BODIES[action],
+                    headers=_JSON_HEADERS
+                )
+            
             payload = {"action": action}
             if target:
                 payload["target"] = target
             if data:
                 payload.update(data)
             
-            logger.debug(f"Sending action: {payload}")
+            logger.debug("Sending action: {}", payload)
             
-            response = self.session.post(
-                f"{BASE_URL}/games/{game_id}/agents/{agent_id}/action",
+            return await self._request(
+                "POST",
+                url,
                 json=payload
             )
-            return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to send action {action}: {e}")
             return None
@@ -3,41 +3,40 @@
 Debug script to test API connectivity
 """
 
-import requests
-import json
+import asyncio
+import orjson
 from datetime import datetime, timezone
 
-BASE_URL = "https://mort-royal-production.up.railway.app/api"
+from api_client import APIClient, BASE_URL
 
-def test_api():
+async def test_api():
     """Test API endpoints"""
     print(f"Testing API at {BASE_URL}")
     print(f"Time: {datetime.now(timezone.utc).isoformat()}")
     print("-" * 50)
-    
-    # Test 1: Create account
-    print("Test 1: Create account")
-    try:
-        response = requests.post(
-            f"{BASE_URL}/accounts",
-            json={"name": "DebugBot"},
-            headers={"Content-Type": "application/json"}
-        )
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"Error: {e}")
-    
-    print("-" * 50)
-    
-    # Test 2: Get waiting games
-    print("Test 2: Get waiting games")
+
+    # Same client and error handling as the agent, one connection for both tests
+    client = APIClient()
     try:
-        response = requests.get(f"{BASE_URL}/games?status=waiting")
-        print(f"Status: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-    except Exception as e:
-        print(f"Error: {e}")
+        # Test 1: Create account
+        print("Test 1: Create account")
+        try:
+            result = await client.create_account("DebugBot")
+            print(f"Response: {orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()}")
+        except Exception as e:
+            print(f"Error: {e}")
+
+        print("-" * 50)
+
+        # Test 2: Get waiting games
+        print("Test 2: Get waiting games")
+        try:
+            result = await client.get_waiting_games()
+            print(f"Response: {orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()}")
+        except Exception as e:
+            print(f"Error: {e}")
+    finally:
+        await client.close()
 
 if __name__ == "__main__":
-    test_api()
+    asyncio.run(test_api())
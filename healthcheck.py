@@ -1,23 +1,66 @@
-from flask import Flask, jsonify
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+import orjson
 import os
 
-app = Flask(__name__)
+# Response bodies are serialized once at import; /health only fills in the time
+_INDEX_BODY = orjson.dumps({
+    "service": "Molty Royale AI Agent",
+    "status": "running",
+    "version": "1.0.0"
+})
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'"}'
 
-@app.route('/health')
-def health():
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    })
+# Seconds a probe gets to send its request headers
+REQUEST_TIMEOUT = 5
 
-@app.route('/')
-def index():
-    return jsonify({
-        "service": "Molty Royale AI Agent",
-        "status": "running",
-        "version": "1.0.0"
-    })
+def _response(status: bytes, body: bytes) -> bytes:
+    """Full HTTP/1.1 response for a JSON body"""
+    return (b"HTTP/1.1 " + status + b"\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body)
+
+_INDEX_RESPONSE = _response(b"200 OK", _INDEX_BODY)
+_NOT_FOUND_RESPONSE = _response(b"404 Not Found", b'{"error":"not found"}')
+
+def health_response() -> bytes:
+    timestamp = datetime.now(timezone.utc).isoformat().encode()
+    return _response(b"200 OK", _HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX)
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Answer one request and close the connection"""
+    try:
+        # Read all headers so closing doesn't reset the connection under the response
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+        parts = head.split(b" ", 2)
+        path = parts[1].split(b"?", 1)[0] if len(parts) > 2 and parts[0] == b"GET" else None
+
+        if path == b"/health":
+            writer.write(health_response())
+        elif path == b"/":
+            writer.write(_INDEX_RESPONSE)
+        else:
+            writer.write(_NOT_FOUND_RESPONSE)
+        await writer.drain()
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_server(host: str = '0.0.0.0', port: Optional[int] = None) -> asyncio.AbstractServer:
+    """Start serving / and /health on the running event loop"""
+    if port is None:
+        port = int(os.getenv('PORT', 8080))
+    return await asyncio.start_server(_handle, host, port)
+
+async def serve(host: str = '0.0.0.0', port: Optional[int] = None):
+    """Serve until cancelled"""
+    server = await start_server(host, port)
+    async with server:
+        await server.serve_forever()
 
 if __name__ == '__main__':
-    port = int(os.getenv('PORT', 8080))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    asyncio.run(serve())
@@ -4,11 +4,13 @@ Molty Royale AI Agent - Main Entry Point
 Optimized for Railway deployment
 """
 
+import asyncio
 import os
 import sys
-import time
+from typing import Optional
 from loguru import logger
-from agent import MoltyAgent
+from agent import ParallelMoltyRunner
+import healthcheck
 from datetime import datetime, timezone
 
 # Configure logging
@@ -18,28 +20,49 @@ logger.add(
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> - <level>{message}</level>",
     level=os.getenv("LOG_LEVEL", "INFO")
 )
+# One log file rotated in place; the file is only opened on the first
+# message and records are written from a background thread
 logger.add(
-    "agent_{time}.log",
+    "agent.log",
     rotation="100 MB",
     retention="7 days",
-    level="DEBUG"
+    level="DEBUG",
+    enqueue=True,
+    delay=True
 )
 
+async def run_agents(agent_name: str, count: int, max_concurrent_requests: int = 0,
+                     health_port: Optional[int] = None) -> bool:
+    """Run `count` agents concurrently on one event loop
+    
+    With `health_port`, the healthcheck probe is served on the same loop.
+    """
+    server = await healthcheck.start_server(port=health_port) if health_port else None
+    try:
+        runner = ParallelMoltyRunner(agent_name, max_concurrent_requests)
+        results = await runner.spawn(count)
+    finally:
+        if server:
+            server.close()
+    return all(result is True for result in results)
+
 def main():
     """Main function"""
     # Get agent name from environment or use default
     agent_name = os.getenv("AGENT_NAME", "ProBot")
+    agent_count = int(os.getenv("AGENT_COUNT", "1"))
+    max_concurrent_requests = int(os.getenv("MAX_CONCURRENT_REQUESTS", "0"))
+    # Railway sets PORT and probes /health on it
+    health_port = int(os.getenv("PORT")) if os.getenv("PORT") else None
     
     logger.info("=" * 50)
-    logger.info(f"Molty Royale AI Agent - {agent_name}")
+    logger.info(f"Molty Royale AI Agent - {agent_name} x{agent_count}")
     logger.info(f"Start time: {datetime.now(timezone.utc).isoformat()} UTC")
     logger.info("=" * 50)
     
-    # Create and run agent
-    agent = MoltyAgent(agent_name)
-    
+    # Create and run agents
     try:
-        success = agent.run()
+        success = asyncio.run(run_agents(agent_name, agent_count, max_concurrent_requests, health_port))
         if success:
             logger.info("Agent finished successfully")
             return 0
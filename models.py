@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+import msgspec
+from typing import Optional, List, Dict, Any, Tuple
 from enum import Enum
 
 class TerrainType(str, Enum):
@@ -28,14 +28,20 @@ class ActionType(str, Enum):
     WHISPER = "whisper"
     BROADCAST = "broadcast"
 
-class Item(BaseModel):
+# Leaf structs hold only decoded JSON values and can never be part of a
+# reference cycle, so the garbage collector doesn't need to track them
+class Item(msgspec.Struct, frozen=True, gc=False):
     id: str
     typeId: str
     category: str
     name: Optional[str] = None
     quantity: int = 1
+    # Untyped so a null or fractional stat can't fail the whole state decode,
+    # read through strategy.item_stat
+    atkBonus: Any = 0  # weapons
+    hpRestore: Any = 0  # recovery items
 
-class Unit(BaseModel):
+class Unit(msgspec.Struct, frozen=True, gc=False):
     id: str
     type: str  # 'agent' or 'monster'
     name: Optional[str]
@@ -43,7 +49,7 @@ class Unit(BaseModel):
     maxHp: int
     position: str  # regionId
 
-class AgentState(BaseModel):
+class AgentState(msgspec.Struct, kw_only=True, frozen=True):
     id: str
     name: str
     hp: int
@@ -51,22 +57,40 @@ class AgentState(BaseModel):
     ep: int
     maxEp: int
     atk: int
-    def_: int = 0  # 'def' is keyword
+    def_: int = msgspec.field(default=0, name='def')  # 'def' is keyword
     vision: int
     regionId: str
-    inventory: List[Item]
+    inventory: Tuple[Item, ...]
     equippedWeapon: Optional[Item]
     isAlive: bool
     kills: int
     recentMessages: List[Dict[str, Any]] = []
-    
-    class Config:
-        fields = {'def_': 'def'}
+    # Game progress and surroundings sent along with the agent. Left untyped
+    # so an unexpected shape can't fail the whole decode; the agent checks
+    # them where it uses them
+    status: Any = 'unknown'
+    turn: Any = None
+    currentTurn: Any = None
+    nextTickAt: Any = None
+    tickEndsAt: Any = None
+    regions: Any = {}
+    adjacentRegions: Any = []
+    units: Any = []
+    items: Any = []
 
-class GameState(BaseModel):
+class StateResponse(msgspec.Struct, frozen=True):
+    """Envelope of the agent state endpoint"""
+    success: bool = False
+    data: Optional[AgentState] = None
+
+class GameState(msgspec.Struct, frozen=True):
     status: str  # waiting, running, finished
     currentTurn: int
     timeRemaining: Optional[int]
     regions: Dict[str, Any]  # Simplified
     units: List[Unit]
-    items: List[Dict[str, Any]]
\ No newline at end of file
+    items: List[Dict[str, Any]]
+
+# Built once at import; decode JSON bytes straight into the models
+STATE_RESPONSE_DECODER = msgspec.json.Decoder(StateResponse, strict=False)
+AGENT_STATE_DECODER = msgspec.json.Decoder(AgentState, strict=False)
\ No newline at end of file
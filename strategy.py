@@ -1,59 +1,101 @@
-from models import AgentState, TerrainType, WeatherType
-from typing import Dict, Any, Optional, List, Tuple
-from loguru import logger
+from models import AgentState, Item
+import functools
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-class TerrainPriority:
-    """Strategic terrain evaluation"""
+# Strategic value of each terrain type, keyed on the raw strings the server
+# sends so region['terrain'] is looked up without going through TerrainType
+TERRAIN_SCORE = {
+    'hills': 100,   # Best vision for PVP
+    'ruins': 85,    # High item find rate
+    'plains': 70,   # Good vision
+    'forest': 50,   # Stealth, but poor vision
+    'water': 20,    # Avoid if possible
+}
+DEFAULT_TERRAIN_SCORE = 40
+
+UNEXPLORED_BONUS = 20
+
+def get_terrain_score(terrain: Any) -> int:
+    """Strategic value of a terrain type; non-string values get the default"""
+    if not isinstance(terrain, str):
+        return DEFAULT_TERRAIN_SCORE
+    return TERRAIN_SCORE.get(terrain, DEFAULT_TERRAIN_SCORE)
+
+def best_adjacent_region(adjacent: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Pick the best adjacent region in one pass
+    
+    Regions without a direction to move in are skipped. Returns
+    (index, score), or (-1, -1) if no region is usable.
+    """
+    best_idx, best_score = -1, -1
     
-    TERRAIN_SCORES = {
-        TerrainType.HILLS: 100,   # Best vision for PVP
-        TerrainType.RUINS: 85,    # High item find rate
-        TerrainType.PLAINS: 70,   # Good vision
-        TerrainType.FOREST: 50,   # Stealth, but poor vision
-        TerrainType.WATER: 20,    # Avoid if possible
-    }
+    for i, adj in enumerate(adjacent):
+        if not adj or not isinstance(adj.get('direction'), str) or adj.get('isDeathZone', False):
+            continue
+        
+        score = get_terrain_score(adj.get('terrain'))
+        if not adj.get('explored', False):
+            score += UNEXPLORED_BONUS
+        
+        if score > best_score:
+            best_idx, best_score = i, score
     
-    @classmethod
-    def get_score(cls, terrain: str) -> int:
-        return cls.TERRAIN_SCORES.get(terrain, 40)
+    return best_idx, best_score
+
+class AttackPolicy(NamedTuple):
+    """Thresholds used by should_attack"""
+    hp_floor: int          # never attack below this HP
+    ep_floor: int          # ... or this EP
+    weak_hp: int           # targets below this HP are weak
+    easy_atk_adv: int      # ATK over target DEF needed to finish a weak target
+    strong_atk_adv: int    # ATK over target DEF that counts as a strong advantage
+    healthy_hp: int        # HP needed to press a strong advantage
+    lethal_atk_delta: int  # target ATK over ours that makes it too dangerous
+
+_POLICY = AttackPolicy(hp_floor=40, ep_floor=2, weak_hp=30, easy_atk_adv=5,
+                       strong_atk_adv=15, healthy_hp=60, lethal_atk_delta=20)
+
+# Reasons behind an attack decision, as small int codes into ATTACK_REASONS
+(HP_TOO_LOW, NOT_ENOUGH_EP, EASY_KILL, STRONG_ADVANTAGE,
+ TARGET_TOO_STRONG, NOT_ADVANTAGEOUS) = range(6)
+ATTACK_REASONS = ("HP too low", "Not enough EP", "Easy kill", "Strong advantage",
+                  "Target too strong", "Not advantageous")
 
 class CombatEvaluator:
-    """Evaluate combat situations"""
+    """Evaluate combat situations
+    
+    Pruning invariant: should_attack rejects every target while the agent is
+    below MIN_HP or MIN_EP, so callers can screen once with can_attack()
+    before evaluating targets, and stop at the first accepted one.
+    """
+    
+    MIN_HP = _POLICY.hp_floor
+    MIN_EP = _POLICY.ep_floor
+    
+    @staticmethod
+    def can_attack(agent: AgentState) -> bool:
+        """Target-independent preconditions of should_attack"""
+        return agent.hp >= CombatEvaluator.MIN_HP and agent.ep >= CombatEvaluator.MIN_EP
     
     @staticmethod
     def should_attack(agent: AgentState, target: Dict[str, Any]) -> Tuple[bool, str]:
         """Decide whether to attack a target"""
+        attack, reason = make_attack_evaluator(agent)(target)
+        return attack, ATTACK_REASONS[reason]
+    
+    @staticmethod
+    def pick_target(agent: AgentState, targets: List[Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], int]]:
+        """First target should_attack accepts, with its reason code
         
-        # Safety first
-        if agent.hp < 40:
-            return False, "HP too low"
-        
-        if agent.ep < 2:
-            return False, "Not enough EP"
-        
-        # Target analysis
-        target_hp = target.get('hp', 100)
-        target_atk = target.get('atk', 10)
-        target_def = target.get('def', 5)
-        
-        # Calculate advantage
-        atk_advantage = agent.atk - target_def
-        def_advantage = agent.def_ - target_atk
-        
-        # Strategic decisions
-        if target_hp < 30:  # Weak target
-            if atk_advantage > 5:
-                return True, "Easy kill"
-        
-        elif atk_advantage > 15:  # Strong advantage
-            if agent.hp > 60:
-                return True, "Strong advantage"
-        
-        elif target_atk > agent.atk + 20:  # Too dangerous
-            return False, "Target too strong"
-        
-        # Default: don't attack
-        return False, "Not advantageous"
+        The agent's stats are bound once for the whole batch; reasons stay
+        codes until someone needs the ATTACK_REASONS text.
+        """
+        evaluate = make_attack_evaluator(agent)
+        for target in targets:
+            attack, reason = evaluate(target)
+            if attack:
+                return target, reason
+        return None
     
     @staticmethod
     def should_flee(agent: AgentState, nearby_threats: List[Dict]) -> bool:
@@ -62,60 +104,131 @@ class CombatEvaluator:
         if not nearby_threats:
             return False
         
-        # Count threats
-        strong_threats = sum(1 for t in nearby_threats 
-                            if t.get('atk', 0) > agent.def_ + 15)
-        
-        # Flee conditions
+        # Flee conditions that don't need to look at each threat
         if agent.hp < 30:
             return True
         
-        if strong_threats >= 2:
-            return True
-        
         if len(nearby_threats) >= 3:
             return True
         
+        # Count threats, stopping once there are enough to flee
+        threshold = agent.def_ + 15
+        strong_threats = 0
+        for t in nearby_threats:
+            if t.get('atk', 0) > threshold:
+                strong_threats += 1
+                if strong_threats >= 2:
+                    return True
+        
         return False
 
+def make_attack_evaluator(agent: AgentState) -> Callable[[Dict[str, Any]], Tuple[bool, int]]:
+    """should_attack specialized to one agent's stats for this turn
+    
+    The returned function takes a target and gives (attack, reason code).
+    Checks that only depend on the agent are settled here, once. Decisions
+    are deliberately not memoized: each agent meets a rival at most once a
+    turn, and a few compares are cheaper than building a cache key.
+    """
+    p = _POLICY
+    
+    # Safety first
+    if agent.hp < p.hp_floor:
+        return lambda target: (False, HP_TOO_LOW)
+    
+    if agent.ep < p.ep_floor:
+        return lambda target: (False, NOT_ENOUGH_EP)
+    
+    atk = agent.atk
+    healthy = agent.hp > p.healthy_hp
+    weak_hp, easy_atk_adv, strong_atk_adv = p.weak_hp, p.easy_atk_adv, p.strong_atk_adv
+    lethal_atk = atk + p.lethal_atk_delta
+    
+    def evaluate(target: Dict[str, Any]) -> Tuple[bool, int]:
+        # Calculate advantage
+        atk_advantage = atk - target.get('def', 5)
+        
+        # Strategic decisions
+        if target.get('hp', 100) < weak_hp:  # Weak target
+            if atk_advantage > easy_atk_adv:
+                return True, EASY_KILL
+        
+        elif atk_advantage > strong_atk_adv:  # Strong advantage
+            if healthy:
+                return True, STRONG_ADVANTAGE
+        
+        elif target.get('atk', 10) > lethal_atk:  # Too dangerous
+            return False, TARGET_TOO_STRONG
+        
+        # Default: don't attack
+        return False, NOT_ADVANTAGEOUS
+    
+    return evaluate
+
+class InventorySummary(NamedTuple):
+    """What the decision checks need from an inventory"""
+    best_weapon: Optional[Item]
+    best_heal: Optional[Item]
+    total_items: int
+
+def item_stat(value: Any) -> float:
+    """Numeric item stat, anything that isn't a number counts as 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+def _summarize(inventory: Tuple[Item, ...]) -> InventorySummary:
+    """Best weapon and healing item in one pass"""
+    best_weapon, best_atk = None, 0
+    best_heal, best_hp = None, 0
+    
+    for item in inventory:
+        if item.category == 'weapon':
+            atk = item_stat(item.atkBonus)
+            if best_weapon is None or atk > best_atk:
+                best_weapon, best_atk = item, atk
+        elif item.category == 'recovery':
+            hp = item_stat(item.hpRestore)
+            if best_heal is None or hp > best_hp:
+                best_heal, best_hp = item, hp
+    
+    return InventorySummary(best_weapon, best_heal, len(inventory))
+
+_summarize_cached = functools.lru_cache(maxsize=32)(_summarize)
+
+def summarize_inventory(inventory: Tuple[Item, ...]) -> InventorySummary:
+    """Best weapon and healing item, cached per inventory"""
+    try:
+        hash(inventory)
+    except TypeError:
+        # A stat holds a list or object, so the inventory can't be a cache key
+        return _summarize(inventory)
+    return _summarize_cached(inventory)
+
 class ItemManager:
     """Smart item management"""
     
     @staticmethod
-    def get_best_weapon(inventory: List[Dict]) -> Optional[Dict]:
+    def get_best_weapon(inventory: Tuple[Item, ...]) -> Optional[Item]:
         """Find best weapon in inventory"""
-        weapons = [item for item in inventory 
-                  if item.get('category') == 'weapon']
-        
-        if not weapons:
-            return None
-        
-        # Sort by damage (simplified)
-        return max(weapons, key=lambda w: w.get('atkBonus', 0))
+        return summarize_inventory(inventory).best_weapon
     
     @staticmethod
     def need_healing(agent: AgentState) -> bool:
         """Check if healing needed"""
-        hp_percent = (agent.hp / agent.maxHp) * 100
+        # Compare hp/maxHp against 30% and 50% without float division
+        hp10 = agent.hp * 10
         
-        if hp_percent < 30:
+        if hp10 < 3 * agent.maxHp:
             return True  # Critical
-        elif hp_percent < 50 and agent.ep >= 1:
+        elif hp10 < 5 * agent.maxHp and agent.ep >= 1:
             return True  # Low but can heal
         return False
     
     @staticmethod
-    def get_best_healing_item(inventory: List[Dict]) -> Optional[Dict]:
-        """Find best healing item"""
-        healing_items = [item for item in inventory 
-                        if item.get('category') == 'recovery']
-        
-        if not healing_items:
-            return None
-        
-        # Prefer items that restore more HP
-        return max(healing_items, 
-                  key=lambda i: i.get('hpRestore', 0))
+    def get_best_healing_item(inventory: Tuple[Item, ...]) -> Optional[Item]:
+        """Find best healing item, preferring items that restore more HP"""
+        return summarize_inventory(inventory).best_heal
 
 class DeathZoneAvoider:
     """Avoid death zone"""
@@ -126,14 +239,57 @@ class DeathZoneAvoider:
         return region.get('isDeathZone', False)
     
     @staticmethod
-    def find_safe_direction(current_region: Dict, adjacent_regions: List[Dict]) -> Optional[str]:
-        """Find direction away from death zone"""
+    def safe_component_sizes(regions: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """Size of the connected safe area each safe region belongs to
+        
+        Regions link to each other through a 'connections' list of region
+        ids (null or any other value means no links); links to regions
+        outside `regions` or in the death zone are ignored.
+        """
+        sizes = {}
+        for start, region in regions.items():
+            if start in sizes or not isinstance(region, dict) or region.get('isDeathZone', False):
+                continue
+            
+            component = [start]
+            sizes[start] = 0
+            stack = [start]
+            while stack:
+                links = regions[stack.pop()].get('connections')
+                for neighbor_id in links if isinstance(links, list) else ():
+                    if not isinstance(neighbor_id, str) or neighbor_id in sizes:
+                        continue
+                    neighbor = regions.get(neighbor_id)
+                    if not isinstance(neighbor, dict) or neighbor.get('isDeathZone', False):
+                        continue
+                    sizes[neighbor_id] = 0
+                    component.append(neighbor_id)
+                    stack.append(neighbor_id)
+            
+            for region_id in component:
+                sizes[region_id] = len(component)
+        return sizes
+    
+    @staticmethod
+    def find_safe_direction(current_region: Dict, adjacent_regions: List[Dict],
+                            component_sizes: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Find direction away from death zone
+        
+        With `component_sizes` (see safe_component_sizes), prefer the exit
+        into the largest safe area over small pockets the zone will swallow.
+        """
         
         # If in death zone, any direction is better
         if DeathZoneAvoider.is_in_death_zone(current_region):
+            best_direction, best_size = None, 0
             for adj in adjacent_regions:
                 if adj and not DeathZoneAvoider.is_in_death_zone(adj):
-                    return adj.get('direction')
+                    if not component_sizes:
+                        return adj.get('direction')
+                    size = component_sizes.get(adj.get('id'), 1)
+                    if size > best_size:
+                        best_direction, best_size = adj.get('direction'), size
+            return best_direction
         
         # Check if death zone is expanding toward us
         return None
\ No newline at end of file
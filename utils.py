@@ -0,0 +1,8 @@
+import os
+
+def atomic_write(path: str, content: str):
+    """Write content in a single call, then atomically swap it into place"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)